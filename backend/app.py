@@ -2,8 +2,12 @@ from flask import Flask, request, jsonify
 from flask_cors import CORS
 from flask_caching import Cache
 from services.pattern_service import PatternService
+from services.export_service import ExportService, ExportInProgress
 from utils.response_formatter import format_response
+import atexit
 import os
+import signal
+import sys
 
 app = Flask(__name__)
 CORS(app)  # Enable CORS for all routes
@@ -15,6 +19,15 @@ cache = Cache(app)
 
 pattern_service = PatternService()
 
+# Persist warm caches so restarts don't begin cold. `python app.py` runs with the debug
+# reloader, whose parent process never serves requests; only the serving child snapshots,
+# otherwise the parent's stale copy would overwrite the child's on every tick and at exit.
+if __name__ != '__main__' or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+    pattern_service.start_snapshot_timer(interval=300)  # Snapshot every 5 minutes
+    atexit.register(pattern_service.save_snapshot)  # And once more on shutdown
+
+export_service = ExportService(pattern_service, output_dir="export")
+
 @app.route('/api/patterns/<company_name>', methods=['GET'])
 @cache.cached(timeout=600, key_prefix='patterns_all')  # Cache for 10 minutes
 def get_all_patterns(company_name):
@@ -80,6 +93,22 @@ def get_available_companies():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/admin/export', methods=['POST'])
+def export_detections():
+    """Export all detections to partitioned Parquet files (new or changed days only, ?full=true for all)"""
+    try:
+        full = request.args.get('full', 'false').lower() == 'true'
+        summary = export_service.export(full=full)
+        return jsonify({
+            'message': 'Export completed',
+            'output_dir': export_service.output_dir,
+            **summary
+        })
+    except ExportInProgress as e:
+        return jsonify({'error': str(e)}), 409
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 # Cache management endpoints
 @app.route('/admin/cache/clear', methods=['POST'])
 def clear_cache():
@@ -103,6 +132,15 @@ def get_cache_stats():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/admin/cache/snapshot', methods=['POST'])
+def save_cache_snapshot():
+    """Write the current caches to disk"""
+    try:
+        pattern_service.save_snapshot()
+        return jsonify({'message': 'Cache snapshot saved'})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/admin/cache/cleanup', methods=['POST'])
 def cleanup_cache():
     """Clean up expired cache entries"""
@@ -113,4 +151,6 @@ def cleanup_cache():
         return jsonify({'error': str(e)}), 500
 
 if __name__ == '__main__':
+    # Exit cleanly on SIGTERM so the shutdown snapshot is written
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
     app.run(debug=True, host='0.0.0.0', port=5000)
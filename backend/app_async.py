@@ -0,0 +1,131 @@
+from flask import Flask, jsonify
+from flask_cors import CORS
+from services.pattern_service import PatternService
+from services.request_executor import RequestExecutor, ExecutorBusy
+from utils.response_formatter import format_response
+import atexit
+import os
+import signal
+import sys
+
+# Async serving mode: same routes and PatternService as app.py, but CPU-bound loading and
+# detection run in a bounded executor so cache hits and /health stay fast while heavy
+# requests are in progress. Identical in-flight requests share one computation, and once
+# the executor is full new heavy requests get 503 with Retry-After instead of queueing.
+
+app = Flask(__name__)
+CORS(app)  # Enable CORS for all routes
+
+pattern_service = PatternService()
+executor = RequestExecutor(
+    max_workers=int(os.environ.get('DETECTION_WORKERS', 2)),     # Heavy jobs running at once
+    max_pending=int(os.environ.get('DETECTION_MAX_PENDING', 8)),  # Running + queued before 503
+    retry_after=int(os.environ.get('DETECTION_RETRY_AFTER', 5))   # Seconds, sent in Retry-After
+)
+
+# Persist warm caches so restarts don't begin cold
+pattern_service.start_snapshot_timer(interval=300)  # Snapshot every 5 minutes
+atexit.register(pattern_service.save_snapshot)  # And once more on shutdown
+atexit.register(executor.shutdown)
+
+VALID_TIMEFRAMES = ['1min', '5min', '10min', '15min', '30min', '60min']
+
+@app.errorhandler(ExecutorBusy)
+def handle_executor_busy(e):
+    """Backpressure: tell clients to come back instead of queueing more heavy work"""
+    response = jsonify({'error': str(e)})
+    response.status_code = 503
+    response.headers['Retry-After'] = str(e.retry_after)
+    return response
+
+@app.route('/api/patterns/<company_name>', methods=['GET'])
+def get_all_patterns(company_name):
+    """Get all patterns for a company across all timeframes"""
+    try:
+        company_name = company_name.upper()
+        if not pattern_service.company_exists(company_name):
+            return jsonify({'error': f'Company {company_name} not found'}), 404
+
+        # Cache hits are answered on the request thread; misses go to the executor
+        patterns = pattern_service.get_cached("all_patterns", company_name)
+        if patterns is None:
+            patterns = executor.run(("all_patterns", company_name),
+                                    pattern_service.detect_all_patterns, company_name)
+        return jsonify(format_response(patterns))
+
+    except ExecutorBusy:
+        raise
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/api/patterns/<company_name>/<timeframe>', methods=['GET'])
+def get_patterns_by_timeframe(company_name, timeframe):
+    """Get patterns for a company for specific timeframe"""
+    try:
+        company_name = company_name.upper()
+        if not pattern_service.company_exists(company_name):
+            return jsonify({'error': f'Company {company_name} not found'}), 404
+
+        if timeframe not in VALID_TIMEFRAMES:
+            return jsonify({'error': f'Invalid timeframe. Valid options: {VALID_TIMEFRAMES}'}), 400
+
+        patterns = pattern_service.get_cached("patterns_timeframe", company_name, timeframe)
+        if patterns is None:
+            patterns = executor.run(("patterns_timeframe", company_name, timeframe),
+                                    pattern_service.detect_patterns_by_timeframe, company_name, timeframe)
+        return jsonify(format_response(patterns))
+
+    except ExecutorBusy:
+        raise
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/health', methods=['GET'])
+def health_check():
+    """Health check endpoint"""
+    return jsonify({'status': 'healthy', 'message': 'Candlestick Pattern Detection API is running'})
+
+@app.route('/api/ohlcv/<company_name>', methods=['GET'])
+def get_ohlcv_data(company_name):
+    """Get OHLCV data for a company"""
+    try:
+        company_name = company_name.upper()
+        if not pattern_service.company_exists(company_name):
+            return jsonify({'error': f'Company {company_name} not found'}), 404
+
+        ohlcv_data = pattern_service.get_cached("ohlcv_data", company_name)
+        if ohlcv_data is None:
+            ohlcv_data = executor.run(("ohlcv_data", company_name),
+                                      pattern_service.get_ohlcv_data, company_name)
+        return jsonify(ohlcv_data)
+
+    except ExecutorBusy:
+        raise
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/companies', methods=['GET'])
+def get_available_companies():
+    """Get list of available companies"""
+    try:
+        companies = pattern_service.get_available_companies()
+        return jsonify({'companies': companies})
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/admin/executor/stats', methods=['GET'])
+def get_executor_stats():
+    """Get executor and cache statistics"""
+    try:
+        return jsonify({
+            'executor': executor.get_stats(),
+            'internal_cache': pattern_service.get_cache_stats()
+        })
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+if __name__ == '__main__':
+    # Exit cleanly on SIGTERM so the shutdown snapshot is written
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    # Threaded server without the reloader: request threads only wait on the executor
+    app.run(host='0.0.0.0', port=5000, threaded=True, debug=False)
@@ -1,12 +1,27 @@
 import numpy as np
 import pandas as pd
-from typing import List, Tuple
+from typing import Dict, List, Optional, Tuple
 
 class CandlestickPatternDetector:
     """Class containing all candlestick pattern detection methods"""
+
+    # Tunable detection thresholds, overridable per call through detect_all_patterns(df, thresholds)
+    DEFAULT_THRESHOLDS = {
+        'doji_max_body_ratio': 0.05,          # Doji body / candle range
+        'doji_max_upper_shadow_ratio': 0.1,   # Doji upper shadow / candle range
+        'doji_min_lower_shadow_ratio': 0.6,   # Doji lower shadow / candle range
+        'hammer_min_lower_shadow': 2.0,       # Hammer lower shadow / body
+        'hammer_max_upper_shadow': 0.5,       # Hammer upper shadow / body
+        'star_max_body_ratio': 0.3,           # Evening star body / first candle body
+        'soldiers_min_body_ratio': 0.3,       # Each soldier body / first candle range
+    }
     
     @staticmethod
-    def detect_dragonfly_doji(df: pd.DataFrame) -> List[Tuple]:
+    def detect_dragonfly_doji(df: pd.DataFrame,
+                              max_body_ratio: float = DEFAULT_THRESHOLDS['doji_max_body_ratio'],
+                              max_upper_shadow_ratio: float = DEFAULT_THRESHOLDS['doji_max_upper_shadow_ratio'],
+                              min_lower_shadow_ratio: float = DEFAULT_THRESHOLDS['doji_min_lower_shadow_ratio']
+                              ) -> List[Tuple]:
         """
         Detect Dragonfly Doji pattern
         Characteristics:
@@ -36,21 +51,23 @@ class CandlestickPatternDetector:
                 lower_shadow_ratio = lower_shadow / total_range
                 
                 # Very small body, minimal upper shadow, significant lower shadow
-                if (body_ratio <= 0.05 and 
-                    upper_shadow_ratio <= 0.1 and 
-                    lower_shadow_ratio >= 0.6):
+                if (body_ratio <= max_body_ratio and 
+                    upper_shadow_ratio <= max_upper_shadow_ratio and 
+                    lower_shadow_ratio >= min_lower_shadow_ratio):
                     patterns.append((df.index[i], "Dragonfly Doji"))
         
         return patterns
     
     @staticmethod
-    def detect_hammer(df: pd.DataFrame) -> List[Tuple]:
+    def detect_hammer(df: pd.DataFrame,
+                      min_lower_shadow: float = DEFAULT_THRESHOLDS['hammer_min_lower_shadow'],
+                      max_upper_shadow: float = DEFAULT_THRESHOLDS['hammer_max_upper_shadow']) -> List[Tuple]:
         """
         Detect Hammer pattern
         Characteristics:
         - Small body
-        - Long lower shadow (at least 2x body size)
-        - Small or no upper shadow
+        - Long lower shadow (at least min_lower_shadow x body size, default 2x)
+        - Small or no upper shadow (at most max_upper_shadow x body size)
         """
         patterns = []
         
@@ -68,8 +85,8 @@ class CandlestickPatternDetector:
             
             # Hammer conditions
             if (body > 0 and 
-                lower_shadow >= 2 * body and 
-                upper_shadow <= body * 0.5):
+                lower_shadow >= min_lower_shadow * body and 
+                upper_shadow <= body * max_upper_shadow):
                 patterns.append((df.index[i], "Hammer"))
         
         return patterns
@@ -101,13 +118,14 @@ class CandlestickPatternDetector:
         return patterns
     
     @staticmethod
-    def detect_evening_star(df: pd.DataFrame) -> List[Tuple]:
+    def detect_evening_star(df: pd.DataFrame,
+                            max_body_ratio: float = DEFAULT_THRESHOLDS['star_max_body_ratio']) -> List[Tuple]:
         """
         Detect Evening Star pattern
         Characteristics:
         - Three candles pattern
         - First: Long bullish candle
-        - Second: Small body (star) - can be bullish or bearish
+        - Second: Small body (star, under max_body_ratio x first body) - can be bullish or bearish
         - Third: Long bearish candle that closes below midpoint of first candle
         """
         patterns = []
@@ -130,7 +148,7 @@ class CandlestickPatternDetector:
             
             # Pattern conditions
             if (first_bullish and
-                second_body < first_body * 0.3 and  # Star is small
+                second_body < first_body * max_body_ratio and  # Star is small
                 third_bearish and
                 third['close'] < (first['open'] + first['close']) / 2 and  # Third closes below first's midpoint
                 second['low'] > first['high']):  # Gap between first and second
@@ -139,14 +157,16 @@ class CandlestickPatternDetector:
         return patterns
     
     @staticmethod
-    def detect_three_white_soldiers(df: pd.DataFrame) -> List[Tuple]:
+    def detect_three_white_soldiers(df: pd.DataFrame,
+                                    min_body_ratio: float = DEFAULT_THRESHOLDS['soldiers_min_body_ratio']
+                                    ) -> List[Tuple]:
         """
         Detect Three White Soldiers pattern
         Characteristics:
         - Three consecutive bullish candles
         - Each candle opens within the previous candle's body
         - Each candle closes higher than the previous
-        - Each candle has a relatively large body
+        - Each candle has a relatively large body (at least min_body_ratio x first candle range)
         """
         patterns = []
         
@@ -177,7 +197,7 @@ class CandlestickPatternDetector:
                 third_body = third['close'] - third['open']
                 
                 # All bodies should be reasonably sized
-                min_body_size = (first['high'] - first['low']) * 0.3
+                min_body_size = (first['high'] - first['low']) * min_body_ratio
                 decent_bodies = (first_body >= min_body_size and 
                                second_body >= min_body_size and 
                                third_body >= min_body_size)
@@ -189,21 +209,34 @@ class CandlestickPatternDetector:
         return patterns
     
     @classmethod
-    def detect_all_patterns(cls, df: pd.DataFrame) -> List[Tuple]:
+    def resolve_thresholds(cls, thresholds: Optional[Dict[str, float]] = None) -> Dict[str, float]:
+        """Merge threshold overrides onto DEFAULT_THRESHOLDS, rejecting unknown names"""
+        thresholds = thresholds or {}
+        unknown = set(thresholds) - set(cls.DEFAULT_THRESHOLDS)
+        if unknown:
+            raise ValueError(f"Unknown thresholds {sorted(unknown)}. Valid options: {sorted(cls.DEFAULT_THRESHOLDS)}")
+        return {**cls.DEFAULT_THRESHOLDS, **thresholds}
+
+    @classmethod
+    def detect_all_patterns(cls, df: pd.DataFrame, thresholds: Optional[Dict[str, float]] = None) -> List[Tuple]:
         """
         Detect all supported patterns in the given DataFrame
+        thresholds: optional overrides for DEFAULT_THRESHOLDS
         Returns list of tuples: (timestamp, pattern_name)
         """
+        t = cls.resolve_thresholds(thresholds)
         all_patterns = []
         
         # Single candle patterns
-        all_patterns.extend(cls.detect_dragonfly_doji(df))
-        all_patterns.extend(cls.detect_hammer(df))
+        all_patterns.extend(cls.detect_dragonfly_doji(df, t['doji_max_body_ratio'],
+                                                      t['doji_max_upper_shadow_ratio'],
+                                                      t['doji_min_lower_shadow_ratio']))
+        all_patterns.extend(cls.detect_hammer(df, t['hammer_min_lower_shadow'], t['hammer_max_upper_shadow']))
         
         # Multi-candle patterns
         all_patterns.extend(cls.detect_rising_window(df))
-        all_patterns.extend(cls.detect_evening_star(df))
-        all_patterns.extend(cls.detect_three_white_soldiers(df))
+        all_patterns.extend(cls.detect_evening_star(df, t['star_max_body_ratio']))
+        all_patterns.extend(cls.detect_three_white_soldiers(df, t['soldiers_min_body_ratio']))
         
         # Sort by timestamp
         all_patterns.sort(key=lambda x: x[0])
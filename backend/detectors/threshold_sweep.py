@@ -0,0 +1,154 @@
+import itertools
+import numpy as np
+import pandas as pd
+from typing import Dict, Iterable, List, Sequence
+
+from detectors.pattern_detectors import CandlestickPatternDetector
+
+# Thresholds each pattern depends on; combinations that only differ elsewhere share one evaluation
+PATTERN_THRESHOLDS = {
+    'Dragonfly Doji': ('doji_max_body_ratio', 'doji_max_upper_shadow_ratio', 'doji_min_lower_shadow_ratio'),
+    'Hammer': ('hammer_min_lower_shadow', 'hammer_max_upper_shadow'),
+    'Rising Window': (),
+    'Evening Star': ('star_max_body_ratio',),
+    'Three White Soldiers': ('soldiers_min_body_ratio',),
+}
+
+
+def threshold_grid(grid: Dict[str, Iterable[float]]) -> List[Dict[str, float]]:
+    """
+    Expand {threshold_name: values} into every combination, other thresholds at their defaults
+    e.g. threshold_grid({'doji_max_body_ratio': [0.05, 0.1], 'star_max_body_ratio': [0.3, 0.5]})
+    """
+    names = list(grid)
+    CandlestickPatternDetector.resolve_thresholds({name: 0 for name in names})  # Validate names
+    return [CandlestickPatternDetector.resolve_thresholds(dict(zip(names, values)))
+            for values in itertools.product(*(list(grid[name]) for name in names))]
+
+
+def _pattern_masks(pattern, o, h, l, c, t):
+    """
+    Vectorised equivalent of the CandlestickPatternDetector loop for one pattern
+    `t` maps threshold names to (k, 1) columns, so every row of the (k, n) result is one combination
+    """
+    n = len(c)
+    body = np.abs(c - o)
+    bullish = c > o
+
+    if pattern == 'Dragonfly Doji':
+        total_range = h - l
+        upper_shadow = h - np.maximum(o, c)
+        lower_shadow = np.minimum(o, c) - l
+        with np.errstate(divide='ignore', invalid='ignore'):
+            body_ratio = body / total_range
+            upper_shadow_ratio = upper_shadow / total_range
+            lower_shadow_ratio = lower_shadow / total_range
+        return ((total_range > 0) &
+                (body_ratio <= t['doji_max_body_ratio']) &
+                (upper_shadow_ratio <= t['doji_max_upper_shadow_ratio']) &
+                (lower_shadow_ratio >= t['doji_min_lower_shadow_ratio']))
+
+    if pattern == 'Hammer':
+        upper_shadow = h - np.maximum(o, c)
+        lower_shadow = np.minimum(o, c) - l
+        return ((body > 0) &
+                (lower_shadow >= t['hammer_min_lower_shadow'] * body) &
+                (upper_shadow <= body * t['hammer_max_upper_shadow']))
+
+    if pattern == 'Rising Window':
+        mask = np.zeros((1, n), dtype=bool)
+        mask[0, 1:] = bullish[:-1] & bullish[1:] & (l[1:] > h[:-1])
+        return mask
+
+    # Three-candle patterns: index i is the third candle, as in the loop detectors
+    k = len(next(iter(t.values())))
+    mask = np.zeros((k, n), dtype=bool)
+    if n < 3:
+        return mask
+    first, second, third = slice(0, n - 2), slice(1, n - 1), slice(2, n)
+
+    if pattern == 'Evening Star':
+        mask[:, 2:] = (bullish[first] &
+                       (body[second] < body[first] * t['star_max_body_ratio']) &
+                       (c[third] < o[third]) &
+                       (c[third] < (o[first] + c[first]) / 2) &
+                       (l[second] > h[first]))
+        return mask
+
+    if pattern == 'Three White Soldiers':
+        min_body_size = (h[first] - l[first]) * t['soldiers_min_body_ratio']
+        mask[:, 2:] = (bullish[first] & bullish[second] & bullish[third] &
+                       (o[second] > o[first]) & (o[second] < c[first]) &
+                       (o[third] > o[second]) & (o[third] < c[second]) &
+                       (c[second] > c[first]) & (c[third] > c[second]) &
+                       (c[first] - o[first] >= min_body_size) &
+                       (c[second] - o[second] >= min_body_size) &
+                       (c[third] - o[third] >= min_body_size))
+        return mask
+
+    raise ValueError(f"Unknown pattern {pattern}")
+
+
+def sweep_thresholds(df: pd.DataFrame, combinations: Sequence[Dict[str, float]],
+                     horizons: Sequence[int] = (1, 5, 10), chunk_size: int = 256) -> pd.DataFrame:
+    """
+    Evaluate many threshold combinations against one OHLC frame in broadcast passes
+    Detections match CandlestickPatternDetector.detect_all_patterns(df, thresholds) for each combination.
+    :param df: OHLC DataFrame (typically resampled) in time order
+    :param combinations: threshold dicts, e.g. from threshold_grid()
+    :param horizons: bars ahead for forward returns, measured from the close of the pattern candle
+    :param chunk_size: combinations evaluated per broadcast, bounding memory to chunk_size x len(df)
+    :return: One row per (combination, pattern) with the thresholds, detection count and, per horizon,
+             mean forward return, hit rate (share of positive returns) and number of returns measured
+    """
+    combinations = [CandlestickPatternDetector.resolve_thresholds(combo) for combo in combinations]
+    o, h, l, c = (df[col].to_numpy(dtype=np.float64) for col in ('open', 'high', 'low', 'close'))
+    n = len(c)
+
+    # Forward returns per horizon: (H, n), NaN where the horizon runs past the data
+    forward = np.full((len(horizons), n), np.nan)
+    for i, horizon in enumerate(horizons):
+        if 0 < horizon < n:
+            forward[i, :-horizon] = c[horizon:] / c[:-horizon] - 1
+    measured = ~np.isnan(forward)
+    returns = np.where(measured, forward, 0.0).T
+    positive = (forward > 0).T.astype(np.float64)
+    measured = measured.T.astype(np.float64)
+
+    rows = []
+    for pattern, names in PATTERN_THRESHOLDS.items():
+        # Evaluate each distinct setting of this pattern's own thresholds once
+        if names:
+            values = np.array([[combo[name] for name in names] for combo in combinations], dtype=np.float64)
+            unique, inverse = np.unique(values, axis=0, return_inverse=True)
+            inverse = inverse.reshape(-1)
+        else:
+            unique, inverse = np.zeros((1, 0)), np.zeros(len(combinations), dtype=int)
+
+        counts = np.zeros(len(unique))
+        sums = np.zeros((len(unique), len(horizons)))
+        hits = np.zeros((len(unique), len(horizons)))
+        measured_counts = np.zeros((len(unique), len(horizons)))
+        for start in range(0, len(unique), chunk_size):
+            chunk = unique[start:start + chunk_size]
+            t = {name: chunk[:, j:j + 1] for j, name in enumerate(names)}
+            mask = np.broadcast_to(_pattern_masks(pattern, o, h, l, c, t), (len(chunk), n))
+            weights = mask.astype(np.float64)
+            counts[start:start + len(chunk)] = weights.sum(axis=1)
+            sums[start:start + len(chunk)] = weights @ returns
+            hits[start:start + len(chunk)] = weights @ positive
+            measured_counts[start:start + len(chunk)] = weights @ measured
+
+        with np.errstate(divide='ignore', invalid='ignore'):
+            means = sums / measured_counts
+            hit_rates = hits / measured_counts
+
+        for combo_id, (combo, u) in enumerate(zip(combinations, inverse)):
+            row = {'combination': combo_id, **combo, 'pattern': pattern, 'count': int(counts[u])}
+            for j, horizon in enumerate(horizons):
+                row[f'fwd_return_mean_{horizon}'] = means[u, j]
+                row[f'hit_rate_{horizon}'] = hit_rates[u, j]
+                row[f'returns_measured_{horizon}'] = int(measured_counts[u, j])
+            rows.append(row)
+
+    return pd.DataFrame(rows)
@@ -0,0 +1,40 @@
+"""
+Bulk export of detection results for offline analytics.
+
+Writes every company's detections to zstd-compressed Parquet partitioned by
+date and timeframe (export/date=YYYY-MM-DD/timeframe=5min/part-0.parquet)
+with columns company, pattern and timestamp (int64 nanoseconds of the CSVs'
+naive exchange-local wall clock, not UTC; read it back with
+pd.to_datetime(df['timestamp']) and localize if a timezone is needed).
+Re-running only exports new or changed days unless --full is given.
+
+Usage:
+    python export_detections.py --output export [--full]
+"""
+import argparse
+import json
+
+from services.export_service import ExportService
+from services.pattern_service import PatternService
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Export detections to partitioned Parquet files')
+    parser.add_argument('--data', default='data', help='Directory containing one folder of CSVs per company')
+    parser.add_argument('--output', default='export', help='Directory to write the partitioned dataset to')
+    parser.add_argument('--full', action='store_true', help='Rewrite every date instead of only new or changed ones')
+    args = parser.parse_args()
+
+    pattern_service = PatternService()
+    pattern_service.data_path = args.data
+    summary = ExportService(pattern_service, output_dir=args.output).export(full=args.full)
+    print(json.dumps({
+        'exported_dates': len(summary['exported_dates']),
+        'skipped_dates': len(summary['skipped_dates']),
+        'rows_written': summary['rows_written'],
+        'failed_files': summary['failed_files']
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
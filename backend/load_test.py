@@ -0,0 +1,390 @@
+"""
+Load-test harness for the Flask API.
+
+Starts app.py, app_async.py or app_optimized.py against a synthetic data/ tree, drives
+concurrent traffic against the patterns, OHLCV and companies endpoints, and
+reports requests per second and p50/p95/p99 latency of successful responses
+per endpoint (503 rejections are counted and timed separately) for a cold
+phase (a fresh server per endpoint, empty caches) and a warm phase (repeated traffic).
+
+Usage:
+    python load_test.py --app app.py --companies 10 --days 5 \
+        --concurrency 8 --requests 500 --mix patterns=5,ohlcv=3,companies=2 \
+        --output load_test_results.json
+"""
+import argparse
+import json
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import numpy as np
+import pandas as pd
+
+BACKEND_DIR = os.path.dirname(os.path.abspath(__file__))
+TIMEFRAMES = ['1min', '5min', '10min', '15min', '30min', '60min']
+
+# URL templates for each endpoint, per app (app_optimized.py has no OHLCV endpoint)
+ENDPOINTS = {
+    'app.py': {
+        'patterns': '/api/patterns/{company}',
+        'patterns_timeframe': '/api/patterns/{company}/{timeframe}',
+        'ohlcv': '/api/ohlcv/{company}',
+        'companies': '/companies',
+    },
+    'app_async.py': {
+        'patterns': '/api/patterns/{company}',
+        'patterns_timeframe': '/api/patterns/{company}/{timeframe}',
+        'ohlcv': '/api/ohlcv/{company}',
+        'companies': '/companies',
+    },
+    'app_optimized.py': {
+        'patterns': '/{company}',
+        'patterns_timeframe': '/{company}/{timeframe}',
+        'companies': '/companies',
+    },
+}
+
+
+def generate_synthetic_data(root, companies=10, days=5, rows_per_day=375, seed=42):
+    """Write a data/<COMPANY>/<DD-MM-YYYY>.csv tree of random-walk 1-minute candles"""
+    rng = np.random.default_rng(seed)
+    data_path = os.path.join(root, 'data')
+    names = [f"SYN{i:03d}" for i in range(companies)]
+    start_day = datetime(2024, 1, 1)
+
+    for name in names:
+        company_path = os.path.join(data_path, name)
+        os.makedirs(company_path, exist_ok=True)
+        price = 100 + rng.random() * 900
+        for day in range(days):
+            session_start = start_day + timedelta(days=day, hours=9, minutes=15)
+            times = pd.date_range(session_start, periods=rows_per_day, freq='1min')
+            close = price + np.cumsum(rng.normal(0, price * 0.001, rows_per_day))
+            open_ = np.concatenate(([price], close[:-1])) + rng.normal(0, price * 0.0002, rows_per_day)
+            high = np.maximum(open_, close) + np.abs(rng.normal(0, price * 0.0005, rows_per_day))
+            low = np.minimum(open_, close) - np.abs(rng.normal(0, price * 0.0005, rows_per_day))
+            price = close[-1]
+            pd.DataFrame({
+                'date': times.strftime('%d-%m-%Y'),
+                'time': times.strftime('%H:%M:%S'),
+                'open': open_.round(2),
+                'high': high.round(2),
+                'low': low.round(2),
+                'close': close.round(2),
+                'volume': rng.integers(100, 10000, rows_per_day),
+            }).to_csv(os.path.join(company_path, times[0].strftime('%d-%m-%Y') + '.csv'), index=False)
+
+    return names
+
+
+def find_free_port():
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(('127.0.0.1', 0))
+        return s.getsockname()[1]
+
+
+class AppServer:
+    """Runs one of the Flask apps in a subprocess rooted at the synthetic data tree"""
+
+    def __init__(self, app_file, workdir, port):
+        self.app_file = app_file
+        self.workdir = workdir
+        self.port = port
+        self.process = None
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.port}"
+
+    def start(self, timeout=30):
+        # Never let a snapshot from a previous server warm up a cold phase
+        snapshot_path = os.path.join(self.workdir, 'cache_snapshot.pkl')
+        if os.path.exists(snapshot_path):
+            os.remove(snapshot_path)
+
+        module = os.path.splitext(self.app_file)[0]
+        bootstrap = (
+            "import sys; sys.path.insert(0, {backend!r}); import {module} as m; "
+            "m.app.run(host='127.0.0.1', port={port}, threaded=True, debug=False)"
+        ).format(backend=BACKEND_DIR, module=module, port=self.port)
+        self.process = subprocess.Popen(
+            [sys.executable, '-c', bootstrap],
+            cwd=self.workdir,
+            stdout=subprocess.DEVNULL,
+            stderr=subprocess.DEVNULL,
+        )
+
+        deadline = time.time() + timeout
+        while time.time() < deadline:
+            if self.process.poll() is not None:
+                raise RuntimeError(f"{self.app_file} exited with code {self.process.returncode}")
+            try:
+                with urllib.request.urlopen(self.base_url + '/health', timeout=1):
+                    return
+            except (urllib.error.URLError, ConnectionError):
+                time.sleep(0.1)
+        self.stop()
+        raise RuntimeError(f"{self.app_file} did not become healthy within {timeout}s")
+
+    def stop(self):
+        if self.process and self.process.poll() is None:
+            self.process.terminate()
+            try:
+                self.process.wait(timeout=10)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+        self.process = None
+
+
+def parse_mix(mix, available):
+    """Parse 'patterns=5,ohlcv=3' into {endpoint: weight}, dropping endpoints the app lacks"""
+    weights = {}
+    for part in mix.split(','):
+        name, _, weight = part.partition('=')
+        name = name.strip()
+        if name not in available:
+            print(f"Skipping endpoint '{name}': not served by this app")
+            continue
+        weights[name] = float(weight) if weight else 1.0
+    if not weights:
+        raise ValueError(f"Traffic mix has no endpoints served by this app. Valid options: {sorted(available)}")
+    return weights
+
+
+def build_url(template, companies, rng):
+    return template.format(company=rng.choice(companies), timeframe=rng.choice(TIMEFRAMES))
+
+
+def timed_get(url, timeout):
+    """Issue a GET and return (latency_seconds, status_code), status None on connection failure"""
+    start = time.perf_counter()
+    try:
+        with urllib.request.urlopen(url, timeout=timeout) as response:
+            response.read()
+            status = response.status
+    except urllib.error.HTTPError as e:
+        status = e.code
+    except (urllib.error.URLError, ConnectionError, TimeoutError):
+        status = None
+    return time.perf_counter() - start, status
+
+
+def prime_urls(base_url, requests_list, concurrency, timeout, max_wait=300):
+    """Request every URL until it succeeds, honouring Retry-After on 503; returns URLs left unprimed"""
+    deadline = time.time() + max_wait
+
+    def worker(item):
+        _, path = item
+        while True:
+            try:
+                with urllib.request.urlopen(base_url + path, timeout=timeout) as response:
+                    response.read()
+                    return None
+            except urllib.error.HTTPError as e:
+                if e.code != 503:
+                    return path
+                retry_after = float(e.headers.get('Retry-After') or 1)
+            except (urllib.error.URLError, ConnectionError, TimeoutError):
+                return path
+            if time.time() + retry_after > deadline:
+                return path
+            time.sleep(retry_after)
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        return [path for path in executor.map(worker, requests_list) if path is not None]
+
+
+def latency_percentiles(latencies):
+    """p50/p95/p99/max in milliseconds, or None when there are no samples"""
+    if not latencies:
+        return None
+    latencies = np.array(latencies) * 1000
+    return {
+        'p50': round(float(np.percentile(latencies, 50)), 2),
+        'p95': round(float(np.percentile(latencies, 95)), 2),
+        'p99': round(float(np.percentile(latencies, 99)), 2),
+        'max': round(float(latencies.max()), 2),
+    }
+
+
+def run_phase(base_url, requests_list, concurrency, timeout):
+    """Fire (endpoint, path) requests with `concurrency` workers and return per-endpoint stats"""
+    samples = {}
+    lock = threading.Lock()
+
+    def worker(item):
+        endpoint, path = item
+        latency, status = timed_get(base_url + path, timeout)
+        with lock:
+            samples.setdefault(endpoint, []).append((latency, status))
+
+    phase_start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        list(executor.map(worker, requests_list))
+    duration = time.perf_counter() - phase_start
+
+    stats = {}
+    for endpoint, results in sorted(samples.items()):
+        succeeded = [latency for latency, status in results if status is not None and status < 400]
+        # 503s are backpressure (app_async.py): fast rejections, kept out of the success percentiles
+        rejected = [latency for latency, status in results if status == 503]
+        stats[endpoint] = {
+            'requests': len(results),
+            'succeeded': len(succeeded),
+            'rejected': len(rejected),
+            'errors': len(results) - len(succeeded) - len(rejected),
+            'requests_per_second': round(len(results) / duration, 2),
+            'successes_per_second': round(len(succeeded) / duration, 2),
+            'latency_ms': latency_percentiles(succeeded),
+            'rejected_latency_ms': latency_percentiles(rejected),
+        }
+    return {
+        'duration_seconds': round(duration, 3),
+        'total_requests': len(requests_list),
+        'requests_per_second': round(len(requests_list) / duration, 2),
+        'endpoints': stats,
+    }
+
+
+def cold_requests(templates, weights, companies):
+    """Every distinct URL of the mix once, grouped by endpoint in mix order"""
+    requests_list = []
+    for endpoint in weights:
+        template = templates[endpoint]
+        if '{company}' not in template:
+            requests_list.append((endpoint, template))
+            continue
+        for company in companies:
+            timeframes = TIMEFRAMES if '{timeframe}' in template else [None]
+            for timeframe in timeframes:
+                requests_list.append((endpoint, template.format(company=company, timeframe=timeframe)))
+    return requests_list
+
+
+def merge_phases(phases):
+    """Combine per-endpoint cold runs into one round; durations add up since the runs were sequential"""
+    duration = sum(phase['duration_seconds'] for phase in phases)
+    total = sum(phase['total_requests'] for phase in phases)
+    endpoints = {}
+    for phase in phases:
+        endpoints.update(phase['endpoints'])
+    return {
+        'duration_seconds': round(duration, 3),
+        'total_requests': total,
+        'requests_per_second': round(total / duration, 2) if duration else 0.0,
+        'endpoints': endpoints,
+    }
+
+
+def warm_requests(templates, weights, companies, total, rng):
+    endpoints = list(weights)
+    chosen = rng.choices(endpoints, weights=[weights[e] for e in endpoints], k=total)
+    return [(endpoint, build_url(templates[endpoint], companies, rng)) for endpoint in chosen]
+
+
+def print_phase(name, phase):
+    print(f"\n{name}: {phase['total_requests']} requests in {phase['duration_seconds']}s "
+          f"({phase['requests_per_second']} req/s)")
+    print(f"  {'endpoint':<20}{'reqs':>7}{'errors':>8}{'503s':>7}{'ok/s':>10}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}")
+    for endpoint, s in phase['endpoints'].items():
+        # Percentiles are over successful responses only
+        lat = s['latency_ms'] or {'p50': '-', 'p95': '-', 'p99': '-'}
+        print(f"  {endpoint:<20}{s['requests']:>7}{s['errors']:>8}{s['rejected']:>7}{s['successes_per_second']:>10}"
+              f"{lat['p50']:>10}{lat['p95']:>10}{lat['p99']:>10}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load-test the pattern detection API')
+    parser.add_argument('--app', choices=sorted(ENDPOINTS), default='app.py', help='Flask app to start')
+    parser.add_argument('--companies', type=int, default=10, help='Synthetic companies to generate')
+    parser.add_argument('--days', type=int, default=5, help='Days of 1-minute data per company')
+    parser.add_argument('--rows-per-day', type=int, default=375, help='1-minute rows per day file')
+    parser.add_argument('--concurrency', type=int, default=8, help='Concurrent client workers')
+    parser.add_argument('--requests', type=int, default=500, help='Requests in the warm phase')
+    parser.add_argument('--mix', default='patterns=4,patterns_timeframe=2,ohlcv=3,companies=1',
+                        help='Weighted traffic mix, e.g. patterns=5,ohlcv=3,companies=2')
+    parser.add_argument('--cold-rounds', type=int, default=1,
+                        help='Cold rounds, each with a fresh server per endpoint (0 to skip)')
+    parser.add_argument('--timeout', type=float, default=120, help='Per-request timeout in seconds')
+    parser.add_argument('--seed', type=int, default=42, help='Seed for data and traffic generation')
+    parser.add_argument('--output', default='load_test_results.json', help='Where to write the JSON results')
+    args = parser.parse_args()
+
+    templates = ENDPOINTS[args.app]
+    weights = parse_mix(args.mix, templates)
+    rng = random.Random(args.seed)
+
+    workdir = tempfile.mkdtemp(prefix='pattern_load_test_')
+    try:
+        print(f"Generating {args.companies} companies x {args.days} days in {workdir}...")
+        companies = generate_synthetic_data(workdir, args.companies, args.days, args.rows_per_day, args.seed)
+        server = AppServer(args.app, workdir, find_free_port())
+
+        results = {
+            'app': args.app,
+            'started_at': datetime.now().isoformat(),
+            'config': {
+                'companies': args.companies,
+                'days': args.days,
+                'rows_per_day': args.rows_per_day,
+                'concurrency': args.concurrency,
+                'requests': args.requests,
+                'mix': weights,
+                'cold_rounds': args.cold_rounds,
+            },
+            'cold': [],
+        }
+
+        # Cold: every distinct URL hit once, with a fresh server per endpoint so no endpoint
+        # is measured against caches another endpoint already filled (OHLCV and patterns share
+        # the parsed files)
+        all_cold = cold_requests(templates, weights, companies)
+        for round_number in range(args.cold_rounds):
+            endpoint_phases = []
+            for endpoint in weights:
+                server.start()
+                try:
+                    endpoint_phases.append(run_phase(server.base_url,
+                                                     [item for item in all_cold if item[0] == endpoint],
+                                                     args.concurrency, args.timeout))
+                finally:
+                    server.stop()
+            phase = merge_phases(endpoint_phases)
+            results['cold'].append(phase)
+            print_phase(f"Cold round {round_number + 1}", phase)
+
+        # Warm: prime every URL (retrying 503s), then measure the weighted mix
+        server.start()
+        try:
+            unprimed = prime_urls(server.base_url, cold_requests(templates, weights, companies),
+                                  args.concurrency, args.timeout)
+            if unprimed:
+                print(f"Warning: {len(unprimed)} URLs could not be primed, the warm phase is partly cold")
+            results['unprimed_urls'] = unprimed
+            results['warm'] = run_phase(server.base_url,
+                                        warm_requests(templates, weights, companies, args.requests, rng),
+                                        args.concurrency, args.timeout)
+        finally:
+            server.stop()
+        print_phase("Warm", results['warm'])
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    with open(args.output, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"\nResults written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
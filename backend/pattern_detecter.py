@@ -1,4 +1,5 @@
 import pandas as pd
+from utils.resampler import resample_ohlc
 
 def load_and_prepare_data(file_path):
     df = pd.read_csv(file_path)
@@ -7,18 +8,46 @@ def load_and_prepare_data(file_path):
     ohlc = df[['open', 'high', 'low', 'close']]  # optionally include 'volume' if needed
     return ohlc
 
+# Thresholds differ from CandlestickPatternDetector: doji body and upper shadow are absolute price
+# distances here, not fractions of the candle range. detect_patterns(..., thresholds) accepts overrides
+# for the checks it runs; it does not run detect_evening_star, so star_max_body_ratio is rejected there
+DEFAULT_THRESHOLDS = {
+    'doji_max_body': 0.05,               # Absolute body size
+    'doji_max_upper_shadow': 0.1,        # Absolute upper shadow
+    'doji_min_lower_shadow_ratio': 0.7,  # Lower shadow / candle range
+    'hammer_min_lower_shadow': 2,        # Lower shadow / body
+    'hammer_max_upper_shadow': 1,        # Upper shadow / body
+    'star_max_body_ratio': 0.5,          # Evening star body / first candle body
+}
+
+# Thresholds detect_patterns actually applies
+DETECT_PATTERNS_THRESHOLDS = ('doji_max_body', 'doji_max_upper_shadow', 'doji_min_lower_shadow_ratio',
+                              'hammer_min_lower_shadow', 'hammer_max_upper_shadow')
+
+def resolve_thresholds(thresholds=None, valid=DEFAULT_THRESHOLDS):
+    """Merge threshold overrides onto DEFAULT_THRESHOLDS, rejecting names not in `valid`"""
+    thresholds = thresholds or {}
+    unknown = set(thresholds) - set(valid)
+    if unknown:
+        raise ValueError(f"Unknown thresholds {sorted(unknown)}. Valid options: {sorted(valid)}")
+    return {**DEFAULT_THRESHOLDS, **thresholds}
+
 # Example pattern functions
-def detect_dragonfly_doji(row):
+def detect_dragonfly_doji(row, max_body=DEFAULT_THRESHOLDS['doji_max_body'],
+                          max_upper_shadow=DEFAULT_THRESHOLDS['doji_max_upper_shadow'],
+                          min_lower_shadow_ratio=DEFAULT_THRESHOLDS['doji_min_lower_shadow_ratio']):
     body = abs(row['close'] - row['open'])
     upper_shadow = row['high'] - max(row['open'], row['close'])
     lower_shadow = min(row['open'], row['close']) - row['low']
-    return body <= 0.05 and upper_shadow <= 0.1 and lower_shadow >= (row['high'] - row['low']) * 0.7
+    return (body <= max_body and upper_shadow <= max_upper_shadow and
+            lower_shadow >= (row['high'] - row['low']) * min_lower_shadow_ratio)
 
-def detect_hammer(row):
+def detect_hammer(row, min_lower_shadow=DEFAULT_THRESHOLDS['hammer_min_lower_shadow'],
+                  max_upper_shadow=DEFAULT_THRESHOLDS['hammer_max_upper_shadow']):
     body = abs(row['close'] - row['open'])
     lower_shadow = min(row['open'], row['close']) - row['low']
     upper_shadow = row['high'] - max(row['open'], row['close'])
-    return lower_shadow >= 2 * body and upper_shadow <= body
+    return lower_shadow >= min_lower_shadow * body and upper_shadow <= body * max_upper_shadow
 
 def detect_rising_window(df):
     windows = []
@@ -31,14 +60,14 @@ def detect_rising_window(df):
             windows.append((df.index[i], "Rising Window"))
     return windows
 
-def detect_evening_star(df):
+def detect_evening_star(df, max_body_ratio=DEFAULT_THRESHOLDS['star_max_body_ratio']):
     stars = []
     for i in range(2, len(df)):
         first = df.iloc[i - 2]
         second = df.iloc[i - 1]
         third = df.iloc[i]
         if (first['close'] > first['open'] and
-            abs(second['close'] - second['open']) < (first['close'] - first['open']) * 0.5 and
+            abs(second['close'] - second['open']) < (first['close'] - first['open']) * max_body_ratio and
             third['close'] < third['open'] and
             third['close'] < (first['open'] + first['close']) / 2):
             stars.append((df.index[i], "Evening Star"))
@@ -57,19 +86,16 @@ def detect_three_white_soldiers(df):
     return soldiers
 
 
-def detect_patterns(df, interval, company_name):
+def detect_patterns(df, interval, company_name, thresholds=None):
+    t = resolve_thresholds(thresholds, DETECT_PATTERNS_THRESHOLDS)
     patterns = []
-    resampled = df.resample(interval).agg({
-        'open': 'first',
-        'high': 'max',
-        'low': 'min',
-        'close': 'last'
-    }).dropna()
+    resampled = resample_ohlc(df, [interval])[interval]
 
     for idx, row in resampled.iterrows():
-        if detect_dragonfly_doji(row):
+        if detect_dragonfly_doji(row, t['doji_max_body'], t['doji_max_upper_shadow'],
+                                 t['doji_min_lower_shadow_ratio']):
             patterns.append((company_name, "Dragonfly Doji", interval, idx))
-        elif detect_hammer(row):
+        elif detect_hammer(row, t['hammer_min_lower_shadow'], t['hammer_max_upper_shadow']):
             patterns.append((company_name, "Hammer", interval, idx))
 
     # Add multi-candle pattern detection
@@ -0,0 +1,225 @@
+import json
+import os
+import shutil
+import threading
+from datetime import datetime
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from detectors.pattern_detectors import CandlestickPatternDetector
+from utils.resampler import resample_ohlc
+
+# Columns stored in each file; date and timeframe live in the partition directory names
+EXPORT_SCHEMA = pa.schema([
+    ('company', pa.string()),
+    ('pattern', pa.string()),
+    # Pattern candle time in nanoseconds since 1970-01-01 of the CSVs' naive exchange-local
+    # wall clock (no timezone is applied), so it is not a UTC epoch
+    ('timestamp', pa.int64()),
+])
+
+# One export at a time per process: concurrent runs would rewrite the same partitions and manifest
+_export_lock = threading.Lock()
+
+
+class ExportInProgress(Exception):
+    """Raised when an export is requested while another one is still running"""
+
+    def __init__(self):
+        super().__init__("An export is already running, try again when it has finished")
+
+
+class ExportService:
+    """
+    Bulk export of detection results to partitioned, compressed Parquet files
+    Layout: <output_dir>/date=YYYY-MM-DD/timeframe=<tf>/part-0.parquet
+    """
+
+    def __init__(self, pattern_service, output_dir="export", row_group_size=100000, compression="zstd"):
+        self.pattern_service = pattern_service
+        self.output_dir = output_dir
+        self.row_group_size = row_group_size  # Rows buffered per timeframe before a row group is flushed
+        self.compression = compression
+
+    def _manifest_path(self):
+        return os.path.join(self.output_dir, "_manifest.json")
+
+    def _load_manifest(self):
+        """Exported dates mapped to the fingerprint of the CSVs they were built from"""
+        if not os.path.exists(self._manifest_path()):
+            return {}
+        with open(self._manifest_path()) as f:
+            return json.load(f)
+
+    def _save_manifest(self, manifest):
+        tmp_path = self._manifest_path() + ".tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f, indent=2, sort_keys=True)
+        os.replace(tmp_path, self._manifest_path())
+
+    def _files_by_date(self):
+        """Group every company CSV by trading date: {date: [(company, file_path), ...]}"""
+        files_by_date = {}
+        data_path = self.pattern_service.data_path
+        # List the directory itself: the API's companies list is cached and may be stale
+        for company in sorted(os.listdir(data_path)):
+            company_path = os.path.join(data_path, company)
+            if not os.path.isdir(company_path):
+                continue
+            for file in os.listdir(company_path):
+                if not file.endswith('.csv'):
+                    continue
+                try:
+                    date = datetime.strptime(file[:-4], '%d-%m-%Y').strftime('%Y-%m-%d')
+                except ValueError:
+                    print(f"Skipping {file} for {company}: filename is not DD-MM-YYYY.csv")
+                    continue
+                files_by_date.setdefault(date, []).append((company, os.path.join(company_path, file)))
+        return files_by_date
+
+    def _load_file(self, file_path):
+        """Parse a full day file (no row limit, unlike the API path)"""
+        df = pd.read_csv(file_path, usecols=['date', 'time', 'open', 'high', 'low', 'close'])
+        df['datetime'] = pd.to_datetime(df['date'] + ' ' + df['time'], format='%d-%m-%Y %H:%M:%S')
+        df.set_index('datetime', inplace=True)
+        return df[['open', 'high', 'low', 'close']]
+
+    def _export_date(self, date, files):
+        """Stream one date's detections into one Parquet file per timeframe, returning (rows written, failed files)"""
+        date_dir = os.path.join(self.output_dir, f"date={date}")
+        tmp_dir = date_dir + ".tmp"
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+        timeframes = self.pattern_service.timeframes
+        writers = {}
+        buffers = {tf: {name: [] for name in EXPORT_SCHEMA.names} for tf in timeframes}
+        rows_written = 0
+        failed_files = []
+
+        def flush(tf):
+            buffer = buffers[tf]
+            if not buffer['timestamp']:
+                return
+            if tf not in writers:
+                tf_dir = os.path.join(tmp_dir, f"timeframe={tf}")
+                os.makedirs(tf_dir, exist_ok=True)
+                writers[tf] = pq.ParquetWriter(os.path.join(tf_dir, "part-0.parquet"), EXPORT_SCHEMA,
+                                               compression=self.compression)
+            writers[tf].write_table(pa.Table.from_pydict(buffer, schema=EXPORT_SCHEMA))
+            for column in buffer.values():
+                column.clear()
+
+        try:
+            # One company-day is in memory at a time; detections are buffered per timeframe
+            for company, file_path in files:
+                try:
+                    resampled = resample_ohlc(self._load_file(file_path), timeframes)
+                except Exception as e:
+                    print(f"Error exporting file {file_path}: {str(e)}")
+                    failed_files.append(file_path)
+                    continue
+                for tf in timeframes:
+                    patterns = CandlestickPatternDetector.detect_all_patterns(resampled[tf],
+                                                                              self.pattern_service.thresholds)
+                    if not patterns:
+                        continue
+                    # Naive index: asi8 is local wall-clock nanoseconds, not UTC
+                    timestamps = pd.DatetimeIndex([p[0] for p in patterns]).as_unit('ns').asi8
+                    buffer = buffers[tf]
+                    buffer['company'].extend([company] * len(patterns))
+                    buffer['pattern'].extend(p[1] for p in patterns)
+                    buffer['timestamp'].extend(timestamps.tolist())
+                    rows_written += len(patterns)
+                    if len(buffer['timestamp']) >= self.row_group_size:
+                        flush(tf)
+            for tf in timeframes:
+                flush(tf)
+        finally:
+            for writer in writers.values():
+                writer.close()
+
+        # Swap the finished partition in by renames. The old partition is moved aside rather
+        # than deleted first, so a crash mid-swap never loses it (see _recover_partitions)
+        old_dir = date_dir + ".old"
+        shutil.rmtree(old_dir, ignore_errors=True)
+        if os.path.exists(date_dir):
+            os.replace(date_dir, old_dir)
+        if os.path.exists(tmp_dir):
+            os.replace(tmp_dir, date_dir)
+        shutil.rmtree(old_dir, ignore_errors=True)
+        return rows_written, failed_files
+
+    def _recover_partitions(self):
+        """Restore partitions left moved aside by an interrupted swap and drop unfinished temp dirs"""
+        for name in os.listdir(self.output_dir):
+            path = os.path.join(self.output_dir, name)
+            if name.endswith(".old"):
+                date_dir = path[:-len(".old")]
+                if os.path.exists(date_dir):
+                    shutil.rmtree(path, ignore_errors=True)
+                else:
+                    os.replace(path, date_dir)
+            elif name.endswith(".tmp") and os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+
+    def _prune_partitions(self, dates):
+        """Remove partitions for dates that no longer have any CSVs"""
+        for name in os.listdir(self.output_dir):
+            if name.startswith("date=") and name[len("date="):] not in dates:
+                print(f"Removing partition {name}: no source files left")
+                shutil.rmtree(os.path.join(self.output_dir, name), ignore_errors=True)
+
+    def export(self, full=False):
+        """
+        Export detections for every company and date
+        Incremental by default: only dates that are new, or whose CSVs changed since
+        the last export, are written. Pass full=True to rewrite everything and remove
+        partitions for dates that no longer exist in the data directory.
+        :return: Summary dict with the dates exported and skipped, the rows written and the
+                 files that could not be read (their dates are retried on the next run)
+        :raises ExportInProgress: if another export is running in this process
+        """
+        if not _export_lock.acquire(blocking=False):
+            raise ExportInProgress()
+        try:
+            return self._export(full)
+        finally:
+            _export_lock.release()
+
+    def _export(self, full):
+        os.makedirs(self.output_dir, exist_ok=True)
+        self._recover_partitions()
+        manifest = {} if full else self._load_manifest()
+        summary = {'exported_dates': [], 'skipped_dates': [], 'rows_written': 0, 'failed_files': []}
+
+        files_by_date = self._files_by_date()
+        if full:
+            self._prune_partitions(files_by_date)
+            self._save_manifest(manifest)
+
+        for date, files in sorted(files_by_date.items()):
+            # Thresholds are part of the fingerprint so retuning re-exports every day
+            fingerprint = self.pattern_service._get_cache_key(
+                sorted(self.pattern_service.thresholds.items()),
+                *((company, self.pattern_service._get_fingerprint(path)) for company, path in sorted(files))
+            )
+            if manifest.get(date) == fingerprint:
+                summary['skipped_dates'].append(date)
+                continue
+
+            print(f"Exporting detections for {date} ({len(files)} files)")
+            rows_written, failed_files = self._export_date(date, sorted(files))
+            summary['rows_written'] += rows_written
+            summary['exported_dates'].append(date)
+            if failed_files:
+                # Leave the date out of the manifest so the next run tries it again
+                summary['failed_files'].extend(failed_files)
+                manifest.pop(date, None)
+            else:
+                # Record progress per date so an interrupted export resumes where it stopped
+                manifest[date] = fingerprint
+            self._save_manifest(manifest)
+
+        return summary
@@ -1,9 +1,11 @@
 import pandas as pd
 import os
 from detectors.pattern_detectors import CandlestickPatternDetector
+from utils.resampler import resample_ohlc
 from datetime import datetime, timedelta
 import hashlib
 import pickle
+import threading
 from functools import lru_cache
 
 class PatternService:
@@ -12,40 +14,82 @@ class PatternService:
         self.timeframes = ['1min', '5min', '10min', '15min', '30min', '60min']
         self.max_files_to_process = 3  # Reduced from 5 for better performance
         self.max_rows_per_file = 200   # Reduced from 500 for better performance
+        self.thresholds = CandlestickPatternDetector.resolve_thresholds()  # Detector thresholds
         self._cache = {}  # Internal memory cache
         self._file_cache = {}  # Cache for loaded files
-        
+        self.snapshot_path = "cache_snapshot.pkl"  # On-disk copy of the caches for warm restarts
+        self._snapshot_loaded = False
+        self._snapshot_timer = None
+
     def set_limits(self, max_files=5, max_rows=500):
         """Allow dynamic adjustment of processing limits"""
         self.max_files_to_process = max_files
         self.max_rows_per_file = max_rows
 
+    def set_thresholds(self, **thresholds):
+        """Override detector thresholds (see CandlestickPatternDetector.DEFAULT_THRESHOLDS)"""
+        self.thresholds = CandlestickPatternDetector.resolve_thresholds({**self.thresholds, **thresholds})
+        # Cached detections were computed with the old thresholds; parsed files stay valid
+        self._cache.clear()
+
     def _get_cache_key(self, *args):
         """Generate a cache key from arguments"""
         key_string = "_".join(str(arg) for arg in args)
         return hashlib.md5(key_string.encode()).hexdigest()
     
+    def _get_fingerprint(self, path):
+        """Fingerprint a data file or directory from its size and modification time"""
+        if not os.path.exists(path):
+            return None
+        if os.path.isdir(path):
+            # Directory listing plus the stats of every CSV below it (one level deep)
+            entries = []
+            for name in sorted(os.listdir(path)):
+                entry_path = os.path.join(path, name)
+                if name.endswith('.csv'):
+                    stat = os.stat(entry_path)
+                    entries.append((name, stat.st_size, stat.st_mtime_ns))
+                elif os.path.isdir(entry_path):
+                    entries.append((name,))
+            return self._get_cache_key(*entries)
+        stat = os.stat(path)
+        return self._get_cache_key(path, stat.st_size, stat.st_mtime_ns)
+
     def _get_from_cache(self, key):
         """Get data from internal cache"""
         return self._cache.get(key)
     
-    def _set_cache(self, key, data, ttl=300):
-        """Set data in internal cache with TTL"""
+    def _set_cache(self, key, data, ttl=300, source=None):
+        """Set data in internal cache with TTL and the fingerprint of the data it was built from"""
         self._cache[key] = {
             'data': data,
             'timestamp': datetime.now(),
-            'ttl': ttl
+            'ttl': ttl,
+            'source': source,
+            'fingerprint': self._get_fingerprint(source) if source else None
         }
     
     def _is_cache_valid(self, key):
         """Check if cached data is still valid"""
-        if key not in self._cache:
+        self._load_snapshot()
+        return self._is_entry_valid(self._cache.get(key))
+
+    def _is_entry_valid(self, cache_entry):
+        """Check a cache entry's TTL (None for a missing entry is never valid)"""
+        if cache_entry is None:
             return False
-        
-        cache_entry = self._cache[key]
         age = (datetime.now() - cache_entry['timestamp']).total_seconds()
         return age < cache_entry['ttl']
     
+    def get_cached(self, *args):
+        """Return a valid cached result for the given key parts, or None (never computes)"""
+        self._load_snapshot()
+        # Single lookup: a concurrent clear between a check and a second read would return None
+        cache_entry = self._get_from_cache(self._get_cache_key(*args))
+        if self._is_entry_valid(cache_entry):
+            return cache_entry['data']
+        return None
+
     def company_exists(self, company_name):
         return os.path.exists(os.path.join(self.data_path, company_name))
 
@@ -67,10 +111,18 @@ class PatternService:
                 all_patterns.append((pattern[0], pattern[1], timeframe, company_name))
         
         # Cache the result
-        self._set_cache(cache_key, all_patterns, ttl=600)  # Cache for 10 minutes
+        company_path = os.path.join(self.data_path, company_name)
+        self._set_cache(cache_key, all_patterns, ttl=600, source=company_path)  # Cache for 10 minutes
         return all_patterns
 
     def detect_patterns_by_timeframe(self, company_name, timeframe):
+        # Check cache first
+        cache_key = self._get_cache_key("patterns_timeframe", company_name, timeframe)
+        cached_data = self.get_cached("patterns_timeframe", company_name, timeframe)
+        if cached_data is not None:
+            print(f"Cache hit for {timeframe} patterns: {company_name}")
+            return cached_data
+
         company_path = os.path.join(self.data_path, company_name)
         all_patterns = []
         
@@ -88,34 +140,60 @@ class PatternService:
         for file in files_to_process:
             file_path = os.path.join(company_path, file)
             try:
-                df = self.load_and_prepare_data(file_path)
-                patterns = self.detect_patterns(df, timeframe, company_name)
+                resampled = self.load_resampled_data(file_path)[timeframe]
+                patterns = CandlestickPatternDetector.detect_all_patterns(resampled, self.thresholds)
                 # Add timeframe and company info to each pattern
                 for pattern in patterns:
                     all_patterns.append((pattern[0], pattern[1], timeframe, company_name))
             except Exception as e:
                 print(f"Error processing file {file}: {str(e)}")
                 continue
+
+        # Cache the result
+        self._set_cache(cache_key, all_patterns, ttl=600, source=company_path)  # Cache for 10 minutes
         return all_patterns
 
     def load_and_prepare_data(self, file_path):
+        """Load a CSV as an OHLC frame, reusing the parsed copy while the file is unchanged"""
+        return self._load_file_entry(file_path)['data']
+
+    def _load_file_entry(self, file_path):
+        """Get the _file_cache entry for a file, parsing it again if it changed since it was loaded"""
+        self._load_snapshot()
+        cache_key = self._get_cache_key("parsed_file", file_path, self.max_rows_per_file)
+        fingerprint = self._get_fingerprint(file_path)
+        cached_file = self._file_cache.get(cache_key)
+        if cached_file and cached_file['fingerprint'] == fingerprint:
+            return cached_file
+
         # Only read a limited number of rows to improve performance
         df = pd.read_csv(file_path, nrows=self.max_rows_per_file)
         df['datetime'] = pd.to_datetime(df['date'] + ' ' + df['time'], format='%d-%m-%Y %H:%M:%S')
         df.set_index('datetime', inplace=True)
-        return df[['open', 'high', 'low', 'close']]
+        ohlc = df[['open', 'high', 'low', 'close']]
+
+        cached_file = {
+            'data': ohlc,
+            'source': file_path,
+            'fingerprint': fingerprint
+        }
+        self._file_cache[cache_key] = cached_file
+        return cached_file
+
+    def load_resampled_data(self, file_path):
+        """Get the file resampled to every timeframe, computed in one pass and cached with the parsed frame"""
+        # Work on the entry we were handed: another thread may replace or expire the cache slot meanwhile
+        cached_file = self._load_file_entry(file_path)
+        if 'resampled' not in cached_file:
+            cached_file['resampled'] = resample_ohlc(cached_file['data'], self.timeframes)
+        return cached_file['resampled']
 
     def detect_patterns(self, df, timeframe, company_name):
         # Resample data according to timeframe
-        resampled = df.resample(timeframe).agg({
-            'open': 'first',
-            'high': 'max',
-            'low': 'min',
-            'close': 'last'
-        }).dropna()
+        resampled = resample_ohlc(df, [timeframe])[timeframe]
 
         # Use the pattern detector to find all patterns
-        patterns = CandlestickPatternDetector.detect_all_patterns(resampled)
+        patterns = CandlestickPatternDetector.detect_all_patterns(resampled, self.thresholds)
         
         return patterns
 
@@ -163,41 +241,122 @@ class PatternService:
                 continue
         
         # Cache the result
-        self._set_cache(cache_key, ohlcv_data, ttl=300)  # Cache for 5 minutes
+        self._set_cache(cache_key, ohlcv_data, ttl=300, source=company_path)  # Cache for 5 minutes
         return ohlcv_data
 
     def clear_cache(self):
         """Clear all cached data"""
         self._cache.clear()
         self._file_cache.clear()
+        # Don't let an old snapshot repopulate what was just cleared
+        self._snapshot_loaded = True
+        if os.path.exists(self.snapshot_path):
+            os.remove(self.snapshot_path)
         print("Cache cleared")
+
+    def save_snapshot(self):
+        """Write the internal and parsed-file caches to disk for fast restarts"""
+        self._load_snapshot()
+        # Copy each entry as well: request threads add keys (e.g. 'resampled') to live entries,
+        # and pickling a dict that changes size mid-dump raises. list() snapshots the items atomically.
+        snapshot = {
+            'cache': {key: dict(entry) for key, entry in list(self._cache.items())},
+            'file_cache': {key: dict(entry) for key, entry in list(self._file_cache.items())},
+            'thresholds': dict(self.thresholds)
+        }
+        # Write to a temp file first so a crash mid-write never leaves a corrupt snapshot
+        tmp_path = self.snapshot_path + ".tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, self.snapshot_path)
+        print(f"Cache snapshot saved: {len(snapshot['cache'])} results, {len(snapshot['file_cache'])} files")
+
+    def _load_snapshot(self):
+        """Lazily restore the on-disk snapshot, dropping entries whose data files have changed"""
+        if self._snapshot_loaded:
+            return
+        self._snapshot_loaded = True
+        if not os.path.exists(self.snapshot_path):
+            return
+
+        try:
+            with open(self.snapshot_path, 'rb') as f:
+                snapshot = pickle.load(f)
+        except Exception as e:
+            print(f"Error loading cache snapshot: {str(e)}")
+            return
+
+        fingerprints = {}
+        restored, dropped = 0, 0
+        if snapshot.get('thresholds') != self.thresholds:
+            # Detections were computed with other thresholds; parsed files are still usable
+            dropped += len(snapshot.get('cache', {}))
+            snapshot['cache'] = {}
+        for target, entries in ((self._cache, snapshot.get('cache', {})),
+                                (self._file_cache, snapshot.get('file_cache', {}))):
+            for key, entry in entries.items():
+                source = entry.get('source')
+                if source not in fingerprints:
+                    fingerprints[source] = self._get_fingerprint(source) if source else None
+                if source is None or entry.get('fingerprint') != fingerprints[source]:
+                    dropped += 1
+                    continue
+                if 'timestamp' in entry:
+                    # Source data is unchanged, so the entry is as fresh as a new computation
+                    entry['timestamp'] = datetime.now()
+                target.setdefault(key, entry)
+                restored += 1
+        print(f"Cache snapshot loaded: {restored} entries restored, {dropped} stale entries dropped")
+
+    def start_snapshot_timer(self, interval=300):
+        """Save a snapshot every `interval` seconds in a background thread"""
+        def run():
+            try:
+                self.save_snapshot()
+            except Exception as e:
+                print(f"Error saving cache snapshot: {str(e)}")
+            self.start_snapshot_timer(interval)
+
+        self._snapshot_timer = threading.Timer(interval, run)
+        self._snapshot_timer.daemon = True
+        self._snapshot_timer.start()
+
+    def stop_snapshot_timer(self):
+        """Stop the periodic snapshot thread"""
+        if self._snapshot_timer:
+            self._snapshot_timer.cancel()
+            self._snapshot_timer = None
     
     def cleanup_expired_cache(self):
         """Remove expired cache entries"""
+        self._load_snapshot()
         expired_keys = []
-        for key in self._cache.keys():
-            if not self._is_cache_valid(key):
+        for key, cache_entry in list(self._cache.items()):
+            if not self._is_entry_valid(cache_entry):
                 expired_keys.append(key)
         
         for key in expired_keys:
-            del self._cache[key]
+            self._cache.pop(key, None)
         
         if expired_keys:
             print(f"Cleaned up {len(expired_keys)} expired cache entries")
     
     def get_cache_stats(self):
         """Get cache statistics"""
-        total_entries = len(self._cache)
-        valid_entries = sum(1 for key in self._cache.keys() if self._is_cache_valid(key))
+        self._load_snapshot()
+        cache_entries = list(self._cache.values())
+        total_entries = len(cache_entries)
+        valid_entries = sum(1 for cache_entry in cache_entries if self._is_entry_valid(cache_entry))
         return {
             'total_entries': total_entries,
             'valid_entries': valid_entries,
-            'expired_entries': total_entries - valid_entries
+            'expired_entries': total_entries - valid_entries,
+            'parsed_files': len(self._file_cache)
         }
 
     def get_available_companies(self):
         # Check cache first
-        cache_key = self._get_cache_key("companies_list")
+        cache_key = self._get_cache_key("companies_list", self.data_path)  # data_path can be changed (export CLI)
         if self._is_cache_valid(cache_key):
             cached_data = self._get_from_cache(cache_key)
             if cached_data:
@@ -210,5 +369,5 @@ class PatternService:
             companies = [name for name in os.listdir(self.data_path) if os.path.isdir(os.path.join(self.data_path, name))]
         
         # Cache the result
-        self._set_cache(cache_key, companies, ttl=1800)  # Cache for 30 minutes
+        self._set_cache(cache_key, companies, ttl=1800, source=self.data_path)  # Cache for 30 minutes
         return companies
@@ -0,0 +1,66 @@
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+
+class ExecutorBusy(Exception):
+    """Raised when the executor already holds its maximum number of requests"""
+
+    def __init__(self, retry_after):
+        super().__init__(f"Server busy, retry after {retry_after} seconds")
+        self.retry_after = retry_after
+
+
+class RequestExecutor:
+    """
+    Bounded executor for CPU-bound request work
+    - At most `max_workers` jobs run at once, so heavy requests can't starve cheap ones
+    - Identical in-flight requests (same key) share one future instead of recomputing
+    - Once `max_pending` distinct jobs are queued or running, new ones raise ExecutorBusy
+    """
+
+    def __init__(self, max_workers=2, max_pending=8, retry_after=5):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.retry_after = retry_after
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="detection")
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self._stats = {'submitted': 0, 'deduplicated': 0, 'rejected': 0}
+
+    def submit(self, key, fn, *args):
+        """Schedule fn(*args) under `key`, joining an identical in-flight job if there is one"""
+        with self._lock:
+            future = self._in_flight.get(key)
+            if future is not None:
+                self._stats['deduplicated'] += 1
+                return future
+            if len(self._in_flight) >= self.max_pending:
+                self._stats['rejected'] += 1
+                raise ExecutorBusy(self.retry_after)
+            future = self._executor.submit(fn, *args)
+            self._in_flight[key] = future
+            self._stats['submitted'] += 1
+        future.add_done_callback(lambda done: self._release(key, done))
+        return future
+
+    def run(self, key, fn, *args):
+        """Submit and wait for the result (exceptions from fn are re-raised here)"""
+        return self.submit(key, fn, *args).result()
+
+    def _release(self, key, future):
+        with self._lock:
+            if self._in_flight.get(key) is future:
+                del self._in_flight[key]
+
+    def get_stats(self):
+        """Get executor statistics"""
+        with self._lock:
+            return {
+                'max_workers': self.max_workers,
+                'max_pending': self.max_pending,
+                'in_flight': len(self._in_flight),
+                **self._stats
+            }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
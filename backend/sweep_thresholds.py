@@ -0,0 +1,78 @@
+"""
+Threshold sweep for tuning CandlestickPatternDetector parameters.
+
+Loads a company's full history, resamples it to each timeframe once, and
+evaluates every combination of the given threshold values in broadcast
+passes, reporting detection counts and forward-return stats per combination.
+Days are concatenated, so forward returns near a session close run into the next day.
+
+Usage:
+    python sweep_thresholds.py --company RELIANCE --timeframes 5min,15min \
+        --grid doji_max_body_ratio=0.02,0.05,0.1 --grid hammer_min_lower_shadow=1.5,2,3 \
+        --horizons 1,5,10 --output sweep_results.csv
+"""
+import argparse
+import os
+
+import pandas as pd
+
+from detectors.pattern_detectors import CandlestickPatternDetector
+from detectors.threshold_sweep import sweep_thresholds, threshold_grid
+from utils.resampler import resample_ohlc, TIMEFRAMES
+
+
+def load_history(company_path):
+    """Concatenate every day file of a company into one time-ordered OHLC frame"""
+    frames = []
+    for file in sorted(os.listdir(company_path)):
+        if not file.endswith('.csv'):
+            continue
+        df = pd.read_csv(os.path.join(company_path, file), usecols=['date', 'time', 'open', 'high', 'low', 'close'])
+        df['datetime'] = pd.to_datetime(df['date'] + ' ' + df['time'], format='%d-%m-%Y %H:%M:%S')
+        frames.append(df.set_index('datetime')[['open', 'high', 'low', 'close']])
+    if not frames:
+        raise ValueError(f"No CSV files found in {company_path}")
+    return pd.concat(frames).sort_index(kind='stable')
+
+
+def parse_grid(items):
+    """Parse ['name=v1,v2', ...] into {name: [v1, v2]}"""
+    grid = {}
+    for item in items:
+        name, _, values = item.partition('=')
+        grid[name.strip()] = [float(v) for v in values.split(',') if v]
+    return grid
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Sweep detector thresholds over a full price history')
+    parser.add_argument('--company', required=True, help='Company folder under the data directory')
+    parser.add_argument('--data', default='data', help='Directory containing one folder of CSVs per company')
+    parser.add_argument('--timeframes', default=','.join(TIMEFRAMES), help='Comma-separated timeframes')
+    parser.add_argument('--grid', action='append', default=[],
+                        help='Threshold values to sweep, e.g. doji_max_body_ratio=0.02,0.05 (repeatable). '
+                             f'Valid names: {", ".join(CandlestickPatternDetector.DEFAULT_THRESHOLDS)}')
+    parser.add_argument('--horizons', default='1,5,10', help='Forward-return horizons in bars')
+    parser.add_argument('--output', default='sweep_results.csv', help='Where to write the results CSV')
+    args = parser.parse_args()
+
+    combinations = threshold_grid(parse_grid(args.grid))
+    horizons = [int(h) for h in args.horizons.split(',')]
+    timeframes = args.timeframes.split(',')
+
+    history = load_history(os.path.join(args.data, args.company.upper()))
+    print(f"Sweeping {len(combinations)} combinations over {len(history)} rows for {args.company.upper()}")
+
+    results = []
+    for tf, resampled in resample_ohlc(history, timeframes).items():
+        result = sweep_thresholds(resampled, combinations, horizons)
+        result.insert(0, 'timeframe', tf)
+        results.append(result)
+        print(f"  {tf}: {len(resampled)} bars")
+
+    pd.concat(results, ignore_index=True).to_csv(args.output, index=False)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == '__main__':
+    main()
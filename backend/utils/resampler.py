@@ -0,0 +1,120 @@
+# Fast OHLC resampling kernel
+import numpy as np
+import pandas as pd
+from pandas.tseries.frequencies import to_offset
+
+TIMEFRAMES = ['1min', '5min', '10min', '15min', '30min', '60min']
+
+
+def _ticks(timeframe, unit):
+    """Length of a pandas offset string in integer ticks of `unit` ('s', 'ms', 'us' or 'ns')"""
+    return pd.Timedelta(timeframe) // pd.Timedelta(1, unit=unit)
+
+
+def _first_valid(values, valid, starts, ends):
+    """First non-NaN value of each [start, end) group, NaN if the group has none"""
+    positions = np.where(valid, np.arange(len(values)), len(values))
+    first = np.minimum.reduceat(positions, starts)
+    found = first < ends
+    out = np.full(len(starts), np.nan)
+    out[found] = values[first[found]]
+    return out
+
+
+def _last_valid(values, valid, starts):
+    """Last non-NaN value of each group starting at `starts`, NaN if the group has none"""
+    positions = np.where(valid, np.arange(len(values)), -1)
+    last = np.maximum.reduceat(positions, starts)
+    # A group with no valid values reduces to -1
+    found = last >= starts
+    out = np.full(len(starts), np.nan)
+    out[found] = values[last[found]]
+    return out
+
+
+def _aggregate(buckets, open_, high, low, close):
+    """
+    Aggregate sorted rows into one bar per distinct bucket id
+    Returns (bucket_ids, open, high, low, close), keeping bars that are partly NaN
+    """
+    starts = np.flatnonzero(np.r_[True, buckets[1:] != buckets[:-1]])
+    ends = np.r_[starts[1:], len(buckets)]
+    return (
+        buckets[starts],
+        _first_valid(open_, ~np.isnan(open_), starts, ends),
+        np.fmax.reduceat(high, starts),
+        np.fmin.reduceat(low, starts),
+        _last_valid(close, ~np.isnan(close), starts),
+    )
+
+
+def resample_ohlc_arrays(timestamps, open_, high, low, close, timeframes=TIMEFRAMES, unit='ns'):
+    """
+    Resample sorted OHLC arrays to several timeframes in one call
+    Equivalent to df.resample(tf).agg(first/max/min/last).dropna() for each timeframe:
+    bins are left-closed, left-labelled and anchored at midnight of the first timestamp.
+    :param timestamps: int64 epoch timestamps in `unit`, sorted ascending
+    :param timeframes: pandas offset strings that are whole multiples of one minute
+    :return: dict of timeframe -> (bucket_start_timestamps, open, high, low, close)
+    """
+    timestamps = np.asarray(timestamps, dtype=np.int64)
+    columns = [np.asarray(c, dtype=np.float64) for c in (open_, high, low, close)]
+    if len(timestamps) == 0:
+        empty = np.array([], dtype=np.float64)
+        return {tf: (timestamps, empty, empty, empty, empty) for tf in timeframes}
+
+    # Bucket boundaries are computed once, at one-minute resolution. Every timeframe is a
+    # whole number of minutes, so coarser bars are aggregated from the one-minute bars
+    # instead of from the raw rows.
+    minute = _ticks('1min', unit)
+    day = _ticks('1D', unit)
+    origin = timestamps[0] - timestamps[0] % day
+    minute_ids = (timestamps - origin) // minute
+    if np.all(minute_ids[1:] != minute_ids[:-1]):
+        # Already one row per minute (the usual 1-minute CSV), nothing to aggregate
+        minute_bars = columns
+    else:
+        minute_ids, *minute_bars = _aggregate(minute_ids, *columns)
+
+    results = {}
+    for tf in timeframes:
+        step = _ticks(tf, unit)
+        if step % minute != 0:
+            raise ValueError(f"Timeframe {tf} is not a whole number of minutes")
+        bucket_ids, o, h, l, c = _aggregate(minute_ids // (step // minute), *minute_bars)
+        keep = ~(np.isnan(o) | np.isnan(h) | np.isnan(l) | np.isnan(c))
+        results[tf] = (origin + bucket_ids[keep] * step, o[keep], h[keep], l[keep], c[keep])
+    return results
+
+
+def resample_ohlc(df, timeframes=TIMEFRAMES):
+    """
+    Resample a DatetimeIndex-ed OHLC DataFrame to several timeframes in one call
+    Returns dict of timeframe -> DataFrame matching
+    df.resample(tf).agg({'open': 'first', 'high': 'max', 'low': 'min', 'close': 'last'}).dropna()
+    """
+    if not df.index.is_monotonic_increasing:
+        df = df.sort_index(kind='stable')
+    unit = df.index.unit
+    arrays = resample_ohlc_arrays(
+        df.index.asi8,
+        df['open'].to_numpy(dtype=np.float64, na_value=np.nan),
+        df['high'].to_numpy(dtype=np.float64, na_value=np.nan),
+        df['low'].to_numpy(dtype=np.float64, na_value=np.nan),
+        df['close'].to_numpy(dtype=np.float64, na_value=np.nan),
+        timeframes,
+        unit,
+    )
+
+    results = {}
+    for tf, (starts, o, h, l, c) in arrays.items():
+        # pandas' dropna keeps a frequency whenever the surviving buckets are evenly spaced
+        # (the mask reduces to a stepped slice), e.g. two bars 42 buckets apart get 42 * tf
+        gaps = np.diff(starts) // _ticks(tf, unit)
+        if len(gaps) == 0 or np.all(gaps == gaps[0]):
+            freq = to_offset(tf) * (int(gaps[0]) if len(gaps) else 1)
+        else:
+            freq = None
+        index = pd.DatetimeIndex(starts.astype(f'datetime64[{unit}]'), name=df.index.name, freq=freq)
+        results[tf] = pd.DataFrame({'open': o, 'high': h, 'low': l, 'close': c}, index=index)
+    return results